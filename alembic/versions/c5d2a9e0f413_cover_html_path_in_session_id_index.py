@@ -0,0 +1,43 @@
+"""Include html_path in the session_id index
+
+Revision ID: c5d2a9e0f413
+Revises: 9f626c3218c2
+Create Date: 2026-10-14 15:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d2a9e0f413"
+down_revision: Union[str, Sequence[str], None] = "9f626c3218c2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rebuild the unique session_id index as a covering index so looking up
+    # a transcript's html_path never has to visit the table heap.
+    op.drop_index(op.f("ix_conversations_session_id"), table_name="conversations")
+    op.create_index(
+        op.f("ix_conversations_session_id"),
+        "conversations",
+        ["session_id"],
+        unique=True,
+        postgresql_include=["html_path"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_conversations_session_id"), table_name="conversations")
+    op.create_index(
+        op.f("ix_conversations_session_id"),
+        "conversations",
+        ["session_id"],
+        unique=True,
+    )
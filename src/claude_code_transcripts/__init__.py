@@ -70,60 +70,62 @@ def get_session_summary(filepath, max_length=200):
             with open(filepath, "r", encoding="utf-8") as f:
                 data = json.load(f)
             loglines = data.get("loglines", [])
-            for entry in loglines:
-                if entry.get("type") == "user":
-                    msg = entry.get("message", {})
-                    content = msg.get("content", "")
-                    if isinstance(content, str) and content.strip():
-                        if len(content) > max_length:
-                            return content[: max_length - 3] + "..."
-                        return content
-            return "(no summary)"
+            return get_first_user_message(loglines, max_length) or "(no summary)"
     except Exception:
         return "(no summary)"
 
 
+def get_first_user_message(entries, max_length=200):
+    """Return the first real user prompt in a sequence of session entries.
+
+    Skips meta entries and wrapper content such as <command-name> tags.
+    Returns the prompt, truncated to max_length, or None if there is none.
+    """
+    for obj in entries:
+        if (
+            obj.get("type") == "user"
+            and not obj.get("isMeta")
+            and obj.get("message", {}).get("content")
+        ):
+            content = obj["message"]["content"]
+            if isinstance(content, str):
+                content = content.strip()
+                if content and not content.startswith("<"):
+                    if len(content) > max_length:
+                        return content[: max_length - 3] + "..."
+                    return content
+    return None
+
+
+def _iter_jsonl_entries(f):
+    """Yield each decoded entry in an open JSONL file, skipping bad lines."""
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
 def _get_jsonl_summary(filepath, max_length=200):
     """Extract summary from JSONL file."""
     try:
         with open(filepath, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    obj = json.loads(line)
-                    # First priority: summary type entries
-                    if obj.get("type") == "summary" and obj.get("summary"):
-                        summary = obj["summary"]
-                        if len(summary) > max_length:
-                            return summary[: max_length - 3] + "..."
-                        return summary
-                except json.JSONDecodeError:
-                    continue
+            for obj in _iter_jsonl_entries(f):
+                # First priority: summary type entries
+                if obj.get("type") == "summary" and obj.get("summary"):
+                    summary = obj["summary"]
+                    if len(summary) > max_length:
+                        return summary[: max_length - 3] + "..."
+                    return summary
 
         # Second pass: find first non-meta user message
         with open(filepath, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    obj = json.loads(line)
-                    if (
-                        obj.get("type") == "user"
-                        and not obj.get("isMeta")
-                        and obj.get("message", {}).get("content")
-                    ):
-                        content = obj["message"]["content"]
-                        if isinstance(content, str):
-                            content = content.strip()
-                            if content and not content.startswith("<"):
-                                if len(content) > max_length:
-                                    return content[: max_length - 3] + "..."
-                                return content
-                except json.JSONDecodeError:
-                    continue
+            first_message = get_first_user_message(_iter_jsonl_entries(f), max_length)
+        if first_message:
+            return first_message
     except Exception:
         pass
 
@@ -140,19 +142,31 @@ def find_local_sessions(folder, limit=10):
     if not folder.exists():
         return []
 
-    results = []
+    candidates = []
     for f in folder.glob("**/*.jsonl"):
         if f.name.startswith("agent-"):
             continue
+        try:
+            mtime = f.stat().st_mtime
+        except OSError:
+            # Dangling symlink, or deleted since the glob ran
+            continue
+        candidates.append((mtime, f))
+
+    # Sort by modification time, most recent first, so only the files
+    # that can make the cut need to be opened for a summary
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+    results = []
+    for _, f in candidates:
+        if len(results) >= limit:
+            break
         summary = get_session_summary(f)
         # Skip boring/empty sessions
         if summary.lower() == "warmup" or summary == "(no summary)":
             continue
         results.append((f, summary))
-
-    # Sort by modification time, most recent first
-    results.sort(key=lambda x: x[0].stat().st_mtime, reverse=True)
-    return results[:limit]
+    return results
 
 
 def parse_session_file(filepath):
@@ -272,26 +286,30 @@ def get_api_headers(token, org_uuid):
     }
 
 
-def fetch_sessions(token, org_uuid):
+def fetch_sessions(token, org_uuid, client=None):
     """Fetch list of sessions from the API.
 
+    Pass an httpx.Client as client to reuse its pooled connections.
     Returns the sessions data as a dict.
     Raises httpx.HTTPError on network/API errors.
     """
     headers = get_api_headers(token, org_uuid)
-    response = httpx.get(f"{API_BASE_URL}/sessions", headers=headers, timeout=30.0)
+    http = client if client is not None else httpx
+    response = http.get(f"{API_BASE_URL}/sessions", headers=headers, timeout=30.0)
     response.raise_for_status()
     return response.json()
 
 
-def fetch_session(token, org_uuid, session_id):
+def fetch_session(token, org_uuid, session_id, client=None):
     """Fetch a specific session from the API.
 
+    Pass an httpx.Client as client to reuse its pooled connections.
     Returns the session data as a dict.
     Raises httpx.HTTPError on network/API errors.
     """
     headers = get_api_headers(token, org_uuid)
-    response = httpx.get(
+    http = client if client is not None else httpx
+    response = http.get(
         f"{API_BASE_URL}/session_ingress/session/{session_id}",
         headers=headers,
         timeout=60.0,
@@ -1,7 +1,7 @@
 """Database models for transcript metadata."""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, create_engine
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 Base = declarative_base()
@@ -11,9 +11,19 @@ class Conversation(Base):
     """Model for storing transcript metadata."""
 
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Unique lookup index that also carries html_path, so the server's
+        # session_id -> html_path lookups are Index Only Scans on Postgres
+        Index(
+            "ix_conversations_session_id",
+            "session_id",
+            unique=True,
+            postgresql_include=["html_path"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    session_id = Column(String(255), unique=True, nullable=False, index=True)
+    session_id = Column(String(255), nullable=False)
     source = Column(String(50), nullable=False)  # 'web' or 'local'
     last_updated = Column(DateTime, nullable=False)
     message_count = Column(Integer, nullable=False)
@@ -14,6 +14,19 @@ from .models import init_db, get_engine, Conversation
 from .sync import sync_all
 
 
+def _get_html_path(db_session, session_id):
+    """Return the HTML directory for a session, or None if it is unknown.
+
+    Only the html_path column is selected so serving a page or asset does
+    not load the full row (including first_message) into an ORM object.
+    """
+    return (
+        db_session.query(Conversation.html_path)
+        .filter_by(session_id=session_id)
+        .scalar()
+    )
+
+
 def create_app(config: Config):
     """Create and configure the Flask application."""
     app = Flask(__name__)
@@ -47,14 +60,12 @@ def create_app(config: Config):
         """View a specific transcript."""
         db_session = app.config["DB_SESSION"]()
         try:
-            conversation = (
-                db_session.query(Conversation).filter_by(session_id=session_id).first()
-            )
-            if not conversation:
+            html_path = _get_html_path(db_session, session_id)
+            if html_path is None:
                 abort(404)
 
             # Serve the index.html from the transcript's directory
-            index_path = Path(conversation.html_path) / "index.html"
+            index_path = Path(html_path) / "index.html"
             if not index_path.exists():
                 abort(404)
 
@@ -78,13 +89,11 @@ def create_app(config: Config):
         """View a specific page of a transcript."""
         db_session = app.config["DB_SESSION"]()
         try:
-            conversation = (
-                db_session.query(Conversation).filter_by(session_id=session_id).first()
-            )
-            if not conversation:
+            html_path = _get_html_path(db_session, session_id)
+            if html_path is None:
                 abort(404)
 
-            page_path = Path(conversation.html_path) / f"page-{page_num:03d}.html"
+            page_path = Path(html_path) / f"page-{page_num:03d}.html"
             if not page_path.exists():
                 abort(404)
 
@@ -108,13 +117,11 @@ def create_app(config: Config):
         """Serve static assets for a transcript."""
         db_session = app.config["DB_SESSION"]()
         try:
-            conversation = (
-                db_session.query(Conversation).filter_by(session_id=session_id).first()
-            )
-            if not conversation:
+            html_path = _get_html_path(db_session, session_id)
+            if html_path is None:
                 abort(404)
 
-            return send_from_directory(conversation.html_path, filename)
+            return send_from_directory(html_path, filename)
         finally:
             db_session.close()
 
@@ -1,24 +1,53 @@
 """Synchronization service for fetching and updating transcripts."""
 
 import os
+import httpx
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from . import (
     find_local_sessions,
     parse_session_file,
-    generate_html,
     fetch_sessions,
     fetch_session,
     resolve_credentials,
     generate_html_from_session_data,
+    get_first_user_message,
 )
 from .models import Conversation
 
+# Number of web sessions fetched from the API in parallel
+WEB_FETCH_WORKERS = 4
 
-def needs_update(existing: Optional[Conversation], session_data: dict) -> bool:
+# Number of updated sessions written per database commit
+SYNC_COMMIT_BATCH_SIZE = 50
+
+# Slack when comparing file mtimes with sync times. Covers filesystems that
+# store mtimes to the second (or two, on FAT) and small clock skew on mounts.
+MTIME_TOLERANCE = timedelta(seconds=2)
+
+
+class ExistingConversation(NamedTuple):
+    """Stored fields sync needs to decide whether and how to update a session.
+
+    A plain tuple rather than a Conversation instance, so commits during the
+    run cannot expire it and trigger a reload query per session.
+    """
+
+    id: int
+    message_count: int
+    last_updated: datetime
+
+
+def needs_update(
+    existing: Optional[Union[Conversation, ExistingConversation]], session_data: dict
+) -> bool:
     """
     Determine if a session needs to be updated.
 
@@ -38,6 +67,147 @@ def needs_update(existing: Optional[Conversation], session_data: dict) -> bool:
     return current_message_count != existing.message_count
 
 
+def modified_since(path, timestamp: datetime) -> bool:
+    """
+    Determine if a file may have been written to since the given time.
+
+    Errs towards True: an mtime within MTIME_TOLERANCE before timestamp
+    still counts as modified. A write during a sync can then be stamped
+    with a coarse mtime earlier than the sync time and still be found.
+
+    Args:
+        path: Path to the file
+        timestamp: Naive UTC datetime, as stored in Conversation.last_updated
+
+    Returns:
+        True if the file's modification time is not clearly before timestamp
+    """
+    mtime = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+    return mtime.replace(tzinfo=None) >= timestamp - MTIME_TOLERANCE
+
+
+def load_existing_conversations(
+    db_session: Session, session_ids: Iterable[str]
+) -> Dict[str, ExistingConversation]:
+    """
+    Load existing conversation records for a whole sync run in one query.
+
+    Args:
+        db_session: Database session
+        session_ids: Session IDs about to be synced
+
+    Returns:
+        Dictionary mapping session ID to its ExistingConversation record
+    """
+    session_ids = list(session_ids)
+    if not session_ids:
+        return {}
+
+    rows = db_session.query(
+        Conversation.session_id,
+        Conversation.id,
+        Conversation.message_count,
+        Conversation.last_updated,
+    ).filter(Conversation.session_id.in_(session_ids))
+    return {
+        row.session_id: ExistingConversation(
+            row.id, row.message_count, row.last_updated
+        )
+        for row in rows
+    }
+
+
+def save_conversation(
+    db_session: Session,
+    existing: Optional[ExistingConversation],
+    session_id: str,
+    source: str,
+    last_updated: datetime,
+    message_count: int,
+    html_path: str,
+    first_message: Optional[str],
+) -> ExistingConversation:
+    """
+    Update or create the database record for a synced session.
+
+    The write runs in a savepoint, so a failure rolls back only this
+    session's changes and leaves the rest of the pending batch intact.
+
+    Args:
+        db_session: Database session
+        existing: Existing record for the session (or None if new)
+        session_id: Session ID
+        source: 'web' or 'local'
+        last_updated: Time of this sync
+        message_count: Number of loglines in the session
+        html_path: Directory holding the generated HTML
+        first_message: Preview text for the index page
+
+    Returns:
+        The ExistingConversation record for the saved row
+    """
+    values = {
+        "last_updated": last_updated,
+        "message_count": message_count,
+        "html_path": html_path,
+        "first_message": first_message,
+    }
+    with db_session.begin_nested():
+        if existing is not None:
+            db_session.execute(
+                update(Conversation)
+                .where(Conversation.id == existing.id)
+                .values(**values)
+            )
+            conversation_id = existing.id
+        else:
+            conversation = Conversation(session_id=session_id, source=source, **values)
+            db_session.add(conversation)
+            db_session.flush()
+            conversation_id = conversation.id
+
+    return ExistingConversation(conversation_id, message_count, last_updated)
+
+
+def commit_batch(
+    db_session: Session,
+    existing_conversations: Dict[str, ExistingConversation],
+    session_ids: List[str],
+) -> bool:
+    """
+    Commit a batch of synced sessions, rolling it back if the commit fails.
+
+    A failed batch is reported and discarded so the sync can carry on with
+    the remaining sessions. The batch's entries in existing_conversations
+    are then reloaded to match what is actually stored.
+
+    Args:
+        db_session: Database session
+        existing_conversations: Records for this sync run, keyed by session ID
+        session_ids: Session IDs written since the last commit
+
+    Returns:
+        True if the batch was committed, False if it was rolled back
+    """
+    try:
+        db_session.commit()
+        return True
+    except Exception as e:
+        print(f"Error committing synced sessions {', '.join(session_ids)}: {e}")
+        db_session.rollback()
+
+    for session_id in session_ids:
+        existing_conversations.pop(session_id, None)
+    try:
+        existing_conversations.update(
+            load_existing_conversations(db_session, session_ids)
+        )
+    except Exception as e:
+        print(f"Error reloading synced sessions: {e}")
+        db_session.rollback()
+    return False
+
+
 def sync_local_sessions(
     db_session: Session,
     storage_path: str,
@@ -68,21 +238,33 @@ def sync_local_sessions(
         print(f"Error finding local sessions: {e}")
         return 0
 
+    existing_conversations = load_existing_conversations(
+        db_session, (Path(session_path).stem for session_path, _ in sessions)
+    )
     updated_count = 0
+    pending_ids = []
 
     for session_path, summary in sessions:
         try:
-            # Parse session file
-            session_data = parse_session_file(session_path)
-
             # Extract session ID from filename
             session_id = Path(session_path).stem
+            existing = existing_conversations.get(session_id)
 
-            # Check if update needed
-            existing = (
-                db_session.query(Conversation).filter_by(session_id=session_id).first()
-            )
+            # A file untouched since it was last synced has no new messages,
+            # so skip parsing it altogether
+            if existing is not None and not modified_since(
+                session_path, existing.last_updated
+            ):
+                continue
+
+            # Taken before parsing so writes that land mid-sync are seen
+            # as modifications on the next run
+            synced_at = datetime.utcnow()
+
+            # Parse session file
+            session_data = parse_session_file(session_path)
 
+            # Check if update needed
             if not needs_update(existing, session_data):
                 continue
 
@@ -90,37 +272,42 @@ def sync_local_sessions(
             output_dir = os.path.join(storage_path, session_id)
             os.makedirs(output_dir, exist_ok=True)
 
-            generate_html(session_path, output_dir, github_repo=github_repo)
+            # Render from the data parsed above rather than re-reading the file
+            generate_html_from_session_data(
+                session_data, output_dir, github_repo=github_repo
+            )
 
             # Extract metadata
             message_count = len(session_data.get("loglines", []))
             first_message = summary[:200] if summary else None
 
             # Update or create database record
-            if existing:
-                existing.last_updated = datetime.utcnow()
-                existing.message_count = message_count
-                existing.html_path = output_dir
-                existing.first_message = first_message
-            else:
-                conversation = Conversation(
-                    session_id=session_id,
-                    source="local",
-                    last_updated=datetime.utcnow(),
-                    message_count=message_count,
-                    html_path=output_dir,
-                    first_message=first_message,
-                )
-                db_session.add(conversation)
-
-            db_session.commit()
+            existing_conversations[session_id] = save_conversation(
+                db_session,
+                existing,
+                session_id=session_id,
+                source="local",
+                last_updated=synced_at,
+                message_count=message_count,
+                html_path=output_dir,
+                first_message=first_message,
+            )
             updated_count += 1
+            pending_ids.append(session_id)
 
         except Exception as e:
             print(f"Error syncing session {session_path}: {e}")
-            db_session.rollback()
             continue
 
+        # Commit in batches so each session does not pay for its own
+        # transaction commit and WAL flush
+        if len(pending_ids) >= SYNC_COMMIT_BATCH_SIZE:
+            if not commit_batch(db_session, existing_conversations, pending_ids):
+                updated_count -= len(pending_ids)
+            pending_ids = []
+
+    if not commit_batch(db_session, existing_conversations, pending_ids):
+        updated_count -= len(pending_ids)
     return updated_count
 
 
@@ -146,81 +333,107 @@ def sync_web_sessions(
     Returns:
         Number of sessions updated
     """
-    try:
-        # Resolve credentials
-        token, org_uuid = resolve_credentials(token, org_uuid)
-
-        # Fetch session list
-        sessions = fetch_sessions(token, org_uuid)
-
-        # Limit number of sessions
-        sessions = sessions[:limit]
-
-    except Exception as e:
-        print(f"Error fetching web sessions: {e}")
-        return 0
-
-    updated_count = 0
-
-    for session_info in sessions:
-        session_id = session_info.get("session_id")
-        if not session_id:
-            continue
-
+    # Share one pooled client across every request in this run so each
+    # session fetch reuses an open connection instead of a fresh handshake
+    with httpx.Client() as client:
         try:
-            # Fetch full session data
-            session_data = fetch_session(token, org_uuid, session_id)
-
-            # Check if update needed
-            existing = (
-                db_session.query(Conversation).filter_by(session_id=session_id).first()
-            )
+            # Resolve credentials
+            token, org_uuid = resolve_credentials(token, org_uuid)
 
-            if not needs_update(existing, session_data):
-                continue
+            # Fetch session list
+            sessions = fetch_sessions(token, org_uuid, client=client)
 
-            # Generate HTML
-            output_dir = os.path.join(storage_path, session_id)
-            os.makedirs(output_dir, exist_ok=True)
+            # Limit number of sessions
+            sessions = sessions.get("data", [])[:limit]
 
-            generate_html_from_session_data(
-                session_data, output_dir, github_repo=github_repo
-            )
-
-            # Extract metadata
-            message_count = len(session_data.get("loglines", []))
-            first_message = None
-            if session_data.get("loglines"):
-                for line in session_data["loglines"]:
-                    if isinstance(line.get("content"), str) and line.get("content"):
-                        first_message = line["content"][:200]
-                        break
-
-            # Update or create database record
-            if existing:
-                existing.last_updated = datetime.utcnow()
-                existing.message_count = message_count
-                existing.html_path = output_dir
-                existing.first_message = first_message
-            else:
-                conversation = Conversation(
-                    session_id=session_id,
-                    source="web",
-                    last_updated=datetime.utcnow(),
-                    message_count=message_count,
-                    html_path=output_dir,
-                    first_message=first_message,
+        except Exception as e:
+            print(f"Error fetching web sessions: {e}")
+            return 0
+
+        session_ids = [info["id"] for info in sessions if info.get("id")]
+        existing_conversations = load_existing_conversations(db_session, session_ids)
+        updated_count = 0
+        pending_ids = []
+
+        # Fetch sessions concurrently so network waits overlap with HTML
+        # generation and database writes, which stay on this thread. A new
+        # fetch is only submitted once a response has been handled, so at
+        # most WEB_FETCH_WORKERS responses are held in memory at once.
+        with ThreadPoolExecutor(max_workers=WEB_FETCH_WORKERS) as executor:
+
+            def submit(session_id):
+                future = executor.submit(
+                    fetch_session, token, org_uuid, session_id, client=client
                 )
-                db_session.add(conversation)
-
-            db_session.commit()
-            updated_count += 1
+                return session_id, future
 
-        except Exception as e:
-            print(f"Error syncing web session {session_id}: {e}")
-            db_session.rollback()
-            continue
+            remaining_ids = iter(session_ids)
+            pending = deque(
+                submit(session_id)
+                for session_id in islice(remaining_ids, WEB_FETCH_WORKERS)
+            )
 
+            while pending:
+                session_id, future = pending.popleft()
+                try:
+                    session_data = future.result()
+
+                    # Check if update needed
+                    existing = existing_conversations.get(session_id)
+
+                    if not needs_update(existing, session_data):
+                        continue
+
+                    # Generate HTML
+                    output_dir = os.path.join(storage_path, session_id)
+                    os.makedirs(output_dir, exist_ok=True)
+
+                    generate_html_from_session_data(
+                        session_data, output_dir, github_repo=github_repo
+                    )
+
+                    # Extract metadata
+                    message_count = len(session_data.get("loglines", []))
+                    first_message = get_first_user_message(
+                        session_data.get("loglines", [])
+                    )
+
+                    # Update or create database record
+                    existing_conversations[session_id] = save_conversation(
+                        db_session,
+                        existing,
+                        session_id=session_id,
+                        source="web",
+                        last_updated=datetime.utcnow(),
+                        message_count=message_count,
+                        html_path=output_dir,
+                        first_message=first_message,
+                    )
+                    updated_count += 1
+                    pending_ids.append(session_id)
+
+                except Exception as e:
+                    print(f"Error syncing web session {session_id}: {e}")
+                    continue
+
+                finally:
+                    # Drop this response before starting the next fetch
+                    session_data = future = None
+                    next_id = next(remaining_ids, None)
+                    if next_id is not None:
+                        pending.append(submit(next_id))
+
+                # Commit in batches so each session does not pay for its own
+                # transaction commit and WAL flush
+                if len(pending_ids) >= SYNC_COMMIT_BATCH_SIZE:
+                    if not commit_batch(
+                        db_session, existing_conversations, pending_ids
+                    ):
+                        updated_count -= len(pending_ids)
+                    pending_ids = []
+
+    if not commit_batch(db_session, existing_conversations, pending_ids):
+        updated_count -= len(pending_ids)
     return updated_count
 
 
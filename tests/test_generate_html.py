@@ -975,6 +975,31 @@ class TestGetSessionSummary:
         summary = get_session_summary(jsonl_file)
         assert summary == "Hello world test"
 
+    def test_json_summary_skips_meta_and_wrapped_messages(self, tmp_path):
+        """Test that JSON sessions use the same first-message filters as JSONL."""
+        json_file = tmp_path / "test.json"
+        json_file.write_text(
+            json.dumps(
+                {
+                    "loglines": [
+                        {
+                            "type": "user",
+                            "isMeta": True,
+                            "message": {"content": "Caveat: meta"},
+                        },
+                        {
+                            "type": "user",
+                            "message": {
+                                "content": "<command-name>/init</command-name>"
+                            },
+                        },
+                        {"type": "user", "message": {"content": "Real prompt"}},
+                    ]
+                }
+            )
+        )
+        assert get_session_summary(json_file) == "Real prompt"
+
     def test_returns_no_summary_for_empty_file(self, tmp_path):
         """Test handling empty or invalid files."""
         jsonl_file = tmp_path / "empty.jsonl"
@@ -1093,6 +1118,50 @@ class TestFindLocalSessions:
         results = find_local_sessions(tmp_path / ".claude" / "projects", limit=3)
         assert len(results) == 3
 
+    def test_only_summarizes_sessions_within_limit(self, tmp_path, monkeypatch):
+        """Test that files beyond the limit are never opened for a summary."""
+        import os
+        import claude_code_transcripts
+
+        projects_dir = tmp_path / ".claude" / "projects" / "test-project"
+        projects_dir.mkdir(parents=True)
+
+        for i in range(5):
+            f = projects_dir / f"session-{i}.jsonl"
+            f.write_text(
+                f'{{"type":"summary","summary":"Session {i}"}}\n{{"type":"user","timestamp":"2025-01-01T00:00:00Z","message":{{"role":"user","content":"test"}}}}\n'
+            )
+            os.utime(f, (1704110400 + i, 1704110400 + i))
+
+        summarized = []
+        original = claude_code_transcripts.get_session_summary
+
+        def tracking_summary(filepath, *args, **kwargs):
+            summarized.append(filepath.name)
+            return original(filepath, *args, **kwargs)
+
+        monkeypatch.setattr(
+            claude_code_transcripts, "get_session_summary", tracking_summary
+        )
+
+        results = find_local_sessions(tmp_path / ".claude" / "projects", limit=2)
+        assert [r[1] for r in results] == ["Session 4", "Session 3"]
+        assert summarized == ["session-4.jsonl", "session-3.jsonl"]
+
+    def test_skips_dangling_symlinks(self, tmp_path):
+        """Test that a file that cannot be stat'ed is skipped, not fatal."""
+        projects_dir = tmp_path / ".claude" / "projects" / "test-project"
+        projects_dir.mkdir(parents=True)
+
+        session_file = projects_dir / "good.jsonl"
+        session_file.write_text(
+            '{"type":"user","timestamp":"2025-01-01T00:00:00Z","message":{"role":"user","content":"Hi"}}\n'
+        )
+        (projects_dir / "broken.jsonl").symlink_to(tmp_path / "nonexistent")
+
+        results = find_local_sessions(tmp_path / ".claude" / "projects", limit=10)
+        assert results == [(session_file, "Hi")]
+
 
 class TestLocalSessionCLI:
     """Tests for CLI behavior with local sessions."""
@@ -87,3 +87,15 @@ def test_conversation_model_unique_session_id(db_session):
     db_session.add(conversation2)
     with pytest.raises(Exception):  # SQLAlchemy will raise an IntegrityError
         db_session.commit()
+
+
+def test_conversation_model_session_id_index_covers_html_path():
+    """Test that the unique session_id index also carries html_path."""
+    (index,) = [
+        index
+        for index in Conversation.__table__.indexes
+        if index.name == "ix_conversations_session_id"
+    ]
+    assert index.unique
+    assert [column.name for column in index.columns] == ["session_id"]
+    assert index.dialect_options["postgresql"]["include"] == ["html_path"]
@@ -0,0 +1,89 @@
+"""Tests for the transcript server."""
+
+import pytest
+from datetime import datetime
+from claude_code_transcripts.config import Config
+from claude_code_transcripts.models import Conversation
+from claude_code_transcripts.server import create_app
+
+
+@pytest.fixture
+def transcript_dir(tmp_path):
+    """Create generated HTML files for a single transcript."""
+    html_dir = tmp_path / "storage" / "session-abc"
+    html_dir.mkdir(parents=True)
+    (html_dir / "index.html").write_text(
+        '<img src="logo.png"><a href="page-001.html">Page 1</a>'
+    )
+    (html_dir / "page-001.html").write_text(
+        '<a href="index.html">Index</a><a href="page-002.html">Next</a>'
+    )
+    (html_dir / "logo.png").write_bytes(b"PNG")
+    return html_dir
+
+
+@pytest.fixture
+def client(tmp_path, transcript_dir, monkeypatch):
+    """Create a test client backed by a SQLite database."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv("STORAGE_PATH", str(tmp_path / "storage"))
+    app = create_app(Config())
+
+    db_session = app.config["DB_SESSION"]()
+    db_session.add(
+        Conversation(
+            session_id="session-abc",
+            source="local",
+            last_updated=datetime(2025, 1, 1, 12, 0, 0),
+            message_count=3,
+            html_path=str(transcript_dir),
+            first_message="Hello",
+        )
+    )
+    db_session.commit()
+    app.config["DB_SESSION"].remove()
+
+    return app.test_client()
+
+
+def test_index_lists_transcripts(client):
+    """Test that the index page lists stored conversations."""
+    response = client.get("/")
+    assert response.status_code == 200
+    assert b"session-abc" in response.data
+
+
+def test_view_transcript(client):
+    """Test that a transcript's index is served with rewritten links."""
+    response = client.get("/transcript/session-abc")
+    assert response.status_code == 200
+    assert b'src="/transcript/session-abc/assets/logo.png"' in response.data
+    assert b'href="/transcript/session-abc/page-001.html"' in response.data
+
+
+def test_view_transcript_unknown_session(client):
+    """Test that an unknown session returns 404."""
+    assert client.get("/transcript/missing").status_code == 404
+    assert client.get("/transcript/missing/page-001.html").status_code == 404
+    assert client.get("/transcript/missing/assets/logo.png").status_code == 404
+
+
+def test_view_page(client):
+    """Test that a transcript page is served with rewritten navigation."""
+    response = client.get("/transcript/session-abc/page-001.html")
+    assert response.status_code == 200
+    assert b'href="/transcript/session-abc"' in response.data
+    assert b'href="/transcript/session-abc/page-002.html"' in response.data
+
+
+def test_view_page_missing_file(client):
+    """Test that a page without a generated file returns 404."""
+    response = client.get("/transcript/session-abc/page-009.html")
+    assert response.status_code == 404
+
+
+def test_serve_asset(client):
+    """Test that static assets are served from the transcript directory."""
+    response = client.get("/transcript/session-abc/assets/logo.png")
+    assert response.status_code == 200
+    assert response.data == b"PNG"
@@ -1,15 +1,23 @@
 """Tests for sync service."""
 
+import json
 import os
+import shutil
+import threading
+import time
 import pytest
 from datetime import datetime
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from claude_code_transcripts.models import Base, Conversation
+from claude_code_transcripts import get_first_user_message
 from claude_code_transcripts.sync import (
+    load_existing_conversations,
+    modified_since,
     needs_update,
     sync_local_sessions,
+    WEB_FETCH_WORKERS,
     sync_web_sessions,
 )
 
@@ -18,6 +26,17 @@ from claude_code_transcripts.sync import (
 def db_session():
     """Create an in-memory SQLite database for testing."""
     engine = create_engine("sqlite:///:memory:")
+
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINT and ROLLBACK behave as
+    # they do on Postgres, rather than pysqlite's implicit transactions
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(engine)
     Session = sessionmaker(bind=engine)
     session = Session()
@@ -33,6 +52,65 @@ def temp_storage(tmp_path):
     return str(storage_path)
 
 
+def make_local_projects(tmp_path, count):
+    """Create a projects directory holding count local session files."""
+    claude_dir = tmp_path / "projects"
+    project_dir = claude_dir / "test_project"
+    project_dir.mkdir(parents=True)
+    for i in range(count):
+        session_file = project_dir / f"session_{i}.jsonl"
+        shutil.copy(Path(__file__).parent / "sample_session.jsonl", session_file)
+        # Newest first, so sessions are synced in index order
+        mtime = time.time() - i
+        os.utime(session_file, (mtime, mtime))
+    return str(claude_dir)
+
+
+@pytest.fixture
+def local_projects(tmp_path):
+    """Create a projects directory holding four local session files."""
+    return make_local_projects(tmp_path, 4)
+
+
+@pytest.fixture
+def local_project(tmp_path):
+    """Create a projects directory holding a single local session file."""
+    return make_local_projects(tmp_path, 1)
+
+
+@pytest.fixture
+def web_session_data():
+    """Load the sample web session returned by the mocked API."""
+    fixture_path = Path(__file__).parent / "sample_session.json"
+    with open(fixture_path) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def commits(db_session, monkeypatch):
+    """Record each commit made on the test database session."""
+    commits = []
+    original_commit = db_session.commit
+    monkeypatch.setattr(
+        db_session, "commit", lambda: commits.append(1) or original_commit()
+    )
+    return commits
+
+
+def add_web_session_responses(httpx_mock, session_data, session_ids, failing=()):
+    """Mock the session list and one fetch per session, failing any in failing."""
+    httpx_mock.add_response(
+        url="https://api.anthropic.com/v1/sessions",
+        json={"data": [{"id": session_id} for session_id in session_ids]},
+    )
+    for session_id in session_ids:
+        url = f"https://api.anthropic.com/v1/session_ingress/session/{session_id}"
+        if session_id in failing:
+            httpx_mock.add_response(url=url, status_code=500)
+        else:
+            httpx_mock.add_response(url=url, json=session_data)
+
+
 def test_needs_update_new_session():
     """Test that a new session needs update."""
     # Session doesn't exist in DB, so it needs update
@@ -66,6 +144,216 @@ def test_needs_update_different_message_count():
     assert needs_update(existing, session_data) is True
 
 
+def test_extract_first_message():
+    """Test finding the first user prompt in session loglines."""
+    loglines = [
+        {"type": "assistant", "message": {"content": "Ignored"}},
+        {
+            "type": "user",
+            "message": {"content": [{"type": "tool_result", "content": "ok"}]},
+        },
+        {"type": "user", "isMeta": True, "message": {"content": "Caveat: meta"}},
+        {
+            "type": "user",
+            "message": {"content": "<command-name>/clear</command-name>"},
+        },
+        {"type": "user", "message": {"content": "  Fix the login bug  "}},
+        {"type": "user", "message": {"content": "Later prompt"}},
+    ]
+    assert get_first_user_message(loglines) == "Fix the login bug"
+    assert get_first_user_message(loglines, max_length=8) == "Fix t..."
+    assert get_first_user_message([]) is None
+
+
+def test_modified_since(tmp_path):
+    """Test comparing a file's mtime against a stored UTC timestamp."""
+    path = tmp_path / "session.jsonl"
+    path.write_text("{}")
+    os.utime(path, (1704110400, 1704110400))  # 2024-01-01 12:00:00 UTC
+
+    assert modified_since(path, datetime(2024, 1, 1, 11, 0, 0)) is True
+    assert modified_since(path, datetime(2024, 1, 1, 13, 0, 0)) is False
+
+
+def test_modified_since_coarse_mtime(tmp_path):
+    """Test that a write in the same second as a sync is not missed."""
+    path = tmp_path / "session.jsonl"
+    path.write_text("{}")
+    # Written during a sync that started at 12:00:00.5, but the filesystem
+    # only keeps whole seconds so the mtime reads 12:00:00
+    os.utime(path, (1704110400, 1704110400))
+
+    assert modified_since(path, datetime(2024, 1, 1, 12, 0, 0, 500000)) is True
+    assert modified_since(path, datetime(2024, 1, 1, 12, 0, 1, 900000)) is True
+    assert modified_since(path, datetime(2024, 1, 1, 12, 0, 5)) is False
+
+
+def test_load_existing_conversations(db_session):
+    """Test that existing records are loaded by session ID in one query."""
+    for session_id in ("a", "b", "c"):
+        db_session.add(
+            Conversation(
+                session_id=session_id,
+                source="local",
+                last_updated=datetime.now(),
+                message_count=1,
+                html_path=f"/path/{session_id}",
+            )
+        )
+    db_session.commit()
+
+    existing = load_existing_conversations(db_session, ["a", "c", "missing"])
+    assert sorted(existing) == ["a", "c"]
+    assert existing["a"].message_count == 1
+    assert load_existing_conversations(db_session, []) == {}
+
+
+def test_sync_web_sessions(db_session, temp_storage, httpx_mock, web_session_data):
+    """Test syncing web sessions fetched from the API."""
+    add_web_session_responses(httpx_mock, web_session_data, ["web-1", "web-2"])
+
+    count = sync_web_sessions(
+        db_session, temp_storage, token="test-token", org_uuid="test-org"
+    )
+    assert count == 2
+
+    conversations = db_session.query(Conversation).order_by(Conversation.id).all()
+    assert [c.session_id for c in conversations] == ["web-1", "web-2"]
+    assert all(c.source == "web" for c in conversations)
+    assert conversations[0].first_message == (
+        "Create a simple Python function to add two numbers"
+    )
+    assert (Path(temp_storage) / "web-1" / "index.html").exists()
+
+
+def test_sync_web_sessions_isolates_failed_fetches(
+    db_session, temp_storage, httpx_mock, web_session_data
+):
+    """Test that one failed fetch does not stop the other sessions syncing."""
+    # More sessions than fetch workers, so the fetch window has to refill
+    session_ids = [f"web-{i}" for i in range(6)]
+    add_web_session_responses(
+        httpx_mock, web_session_data, session_ids, failing={"web-2"}
+    )
+
+    count = sync_web_sessions(
+        db_session, temp_storage, token="test-token", org_uuid="test-org"
+    )
+    assert count == 5
+
+    conversations = db_session.query(Conversation).order_by(Conversation.id).all()
+    assert [c.session_id for c in conversations] == [
+        "web-0",
+        "web-1",
+        "web-3",
+        "web-4",
+        "web-5",
+    ]
+
+
+def test_sync_web_sessions_fetches_concurrently(
+    db_session, temp_storage, web_session_data, monkeypatch
+):
+    """Test that fetches overlap, stay bounded and are handled in order."""
+    session_ids = [f"web-{i}" for i in range(WEB_FETCH_WORKERS * 2)]
+    lock = threading.Lock()
+    # The first batch of fetches can only get past this if they run together
+    barrier = threading.Barrier(WEB_FETCH_WORKERS, timeout=5)
+    active = []
+    max_active = []
+
+    def fake_fetch_session(token, org_uuid, session_id, client=None):
+        index = session_ids.index(session_id)
+        with lock:
+            active.append(session_id)
+            max_active.append(len(active))
+        try:
+            if index < WEB_FETCH_WORKERS:
+                barrier.wait()
+            # Earlier sessions finish last, so completion order is reversed
+            time.sleep((len(session_ids) - index) * 0.01)
+            return web_session_data
+        finally:
+            with lock:
+                active.remove(session_id)
+
+    monkeypatch.setattr(
+        "claude_code_transcripts.sync.fetch_sessions",
+        lambda token, org_uuid, client=None: {
+            "data": [{"id": session_id} for session_id in session_ids]
+        },
+    )
+    monkeypatch.setattr(
+        "claude_code_transcripts.sync.fetch_session", fake_fetch_session
+    )
+
+    count = sync_web_sessions(
+        db_session, temp_storage, token="test-token", org_uuid="test-org"
+    )
+    assert count == len(session_ids)
+    assert max(max_active) == WEB_FETCH_WORKERS
+
+    conversations = db_session.query(Conversation).order_by(Conversation.id).all()
+    assert [c.session_id for c in conversations] == session_ids
+
+
+def test_sync_web_sessions_commits_in_batches(
+    db_session, temp_storage, httpx_mock, web_session_data, commits, monkeypatch
+):
+    """Test that updated sessions are committed in batches, not one by one."""
+    add_web_session_responses(
+        httpx_mock, web_session_data, [f"web-{i}" for i in range(5)]
+    )
+
+    monkeypatch.setattr("claude_code_transcripts.sync.SYNC_COMMIT_BATCH_SIZE", 2)
+
+    count = sync_web_sessions(
+        db_session, temp_storage, token="test-token", org_uuid="test-org"
+    )
+    assert count == 5
+    # Two full batches, then the final commit picks up the remainder
+    assert len(commits) == 3
+    assert db_session.query(Conversation).count() == 5
+
+
+def test_sync_web_sessions_isolates_failed_writes(
+    db_session, temp_storage, httpx_mock, web_session_data, monkeypatch
+):
+    """Test that a failed database write only rolls back its own session."""
+    db_session.add(
+        Conversation(
+            session_id="web-1",
+            source="web",
+            last_updated=datetime.now(),
+            message_count=1,
+            html_path="/path/web-1",
+        )
+    )
+    db_session.commit()
+
+    add_web_session_responses(
+        httpx_mock, web_session_data, [f"web-{i}" for i in range(3)]
+    )
+
+    # Hide the existing record so syncing web-1 hits a unique constraint error
+    monkeypatch.setattr(
+        "claude_code_transcripts.sync.load_existing_conversations",
+        lambda db_session, session_ids: {},
+    )
+
+    count = sync_web_sessions(
+        db_session, temp_storage, token="test-token", org_uuid="test-org"
+    )
+    assert count == 2
+
+    conversations = db_session.query(Conversation).order_by(Conversation.id).all()
+    assert [(c.session_id, c.html_path) for c in conversations] == [
+        ("web-1", "/path/web-1"),
+        ("web-0", os.path.join(temp_storage, "web-0")),
+        ("web-2", os.path.join(temp_storage, "web-2")),
+    ]
+
+
 def test_sync_local_sessions_empty_directory(db_session, temp_storage):
     """Test syncing with no local sessions."""
     # Create empty ~/.claude/projects directory
@@ -79,6 +367,175 @@ def test_sync_local_sessions_empty_directory(db_session, temp_storage):
     assert count == 0
 
 
+def test_sync_local_sessions_loads_records_in_one_query(
+    db_session, temp_storage, local_projects, monkeypatch
+):
+    """Test that updating several sessions does not reload each record."""
+    # Commit after every session so expire-on-commit would force reloads
+    monkeypatch.setattr("claude_code_transcripts.sync.SYNC_COMMIT_BATCH_SIZE", 1)
+    assert (
+        sync_local_sessions(
+            db_session, temp_storage, claude_projects_dir=local_projects
+        )
+        == 4
+    )
+
+    # Make every record stale so the next run updates all four
+    db_session.query(Conversation).update({"message_count": 0})
+    db_session.commit()
+    future = time.time() + 60
+    for session_file in Path(local_projects).glob("*/*.jsonl"):
+        os.utime(session_file, (future, future))
+
+    selects = []
+
+    def record_select(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record_select)
+    try:
+        count = sync_local_sessions(
+            db_session, temp_storage, claude_projects_dir=local_projects
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record_select)
+
+    assert count == 4
+    assert len(selects) == 1
+    assert {c.message_count for c in db_session.query(Conversation)} != {0}
+
+
+def test_sync_local_sessions_skips_unmodified_files(
+    db_session, temp_storage, local_project
+):
+    """Test that files untouched since the last sync are not re-parsed."""
+    session_file = Path(local_project) / "test_project" / "session_0.jsonl"
+
+    count = sync_local_sessions(
+        db_session, temp_storage, claude_projects_dir=local_project
+    )
+    assert count == 1
+
+    # Make the stored count stale so only the mtime check prevents an update
+    conversation = db_session.query(Conversation).one()
+    conversation.message_count = 0
+    db_session.commit()
+
+    os.utime(session_file, (1704110400, 1704110400))
+    count = sync_local_sessions(
+        db_session, temp_storage, claude_projects_dir=local_project
+    )
+    assert count == 0
+
+    future = time.time() + 60
+    os.utime(session_file, (future, future))
+    count = sync_local_sessions(
+        db_session, temp_storage, claude_projects_dir=local_project
+    )
+    assert count == 1
+    assert db_session.query(Conversation).one().message_count > 0
+
+
+def test_sync_local_sessions_parses_each_file_once(
+    db_session, temp_storage, local_project, monkeypatch
+):
+    """Test that HTML is rendered from the already-parsed session data."""
+    import claude_code_transcripts
+
+    parsed = []
+    original = claude_code_transcripts._parse_jsonl_file
+
+    def tracking_parse(filepath):
+        parsed.append(filepath.name)
+        return original(filepath)
+
+    monkeypatch.setattr(claude_code_transcripts, "_parse_jsonl_file", tracking_parse)
+
+    count = sync_local_sessions(
+        db_session, temp_storage, claude_projects_dir=local_project
+    )
+    assert count == 1
+    assert parsed == ["session_0.jsonl"]
+    assert (Path(temp_storage) / "session_0" / "index.html").exists()
+
+
+def test_sync_local_sessions_commits_in_batches(
+    db_session, temp_storage, local_projects, commits, monkeypatch
+):
+    """Test that local sessions are committed in batches, not one by one."""
+    monkeypatch.setattr("claude_code_transcripts.sync.SYNC_COMMIT_BATCH_SIZE", 3)
+
+    count = sync_local_sessions(
+        db_session, temp_storage, claude_projects_dir=local_projects
+    )
+    assert count == 4
+    # One full batch, then the final commit picks up the remainder
+    assert len(commits) == 2
+    assert db_session.query(Conversation).count() == 4
+
+
+def test_sync_local_sessions_isolates_failed_writes(
+    db_session, temp_storage, local_projects, monkeypatch
+):
+    """Test that a failed local write only rolls back its own session."""
+    db_session.add(
+        Conversation(
+            session_id="session_1",
+            source="local",
+            last_updated=datetime(2024, 1, 1),
+            message_count=1,
+            html_path="/path/session_1",
+        )
+    )
+    db_session.commit()
+
+    # Hide the existing record so syncing session_1 hits a unique constraint
+    monkeypatch.setattr(
+        "claude_code_transcripts.sync.load_existing_conversations",
+        lambda db_session, session_ids: {},
+    )
+
+    count = sync_local_sessions(
+        db_session, temp_storage, claude_projects_dir=local_projects
+    )
+    assert count == 3
+
+    conversations = db_session.query(Conversation).order_by(Conversation.id).all()
+    assert [(c.session_id, c.html_path) for c in conversations] == [
+        ("session_1", "/path/session_1"),
+        ("session_0", os.path.join(temp_storage, "session_0")),
+        ("session_2", os.path.join(temp_storage, "session_2")),
+        ("session_3", os.path.join(temp_storage, "session_3")),
+    ]
+
+
+def test_sync_local_sessions_survives_failed_commit(
+    db_session, temp_storage, local_projects, monkeypatch
+):
+    """Test that a failed batch commit is rolled back and the sync carries on."""
+    monkeypatch.setattr("claude_code_transcripts.sync.SYNC_COMMIT_BATCH_SIZE", 2)
+    original_commit = db_session.commit
+    calls = []
+
+    def failing_first_commit():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+        original_commit()
+
+    monkeypatch.setattr(db_session, "commit", failing_first_commit)
+
+    count = sync_local_sessions(
+        db_session, temp_storage, claude_projects_dir=local_projects
+    )
+    # The first batch is lost, the second is committed
+    assert count == 2
+    session_ids = sorted(c.session_id for c in db_session.query(Conversation))
+    assert session_ids == ["session_2", "session_3"]
+
+
 @pytest.mark.skip(reason="Integration test - requires complex session file setup")
 def test_sync_local_sessions_with_session(db_session, temp_storage, tmp_path):
     """Test syncing with a local session file."""